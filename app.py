@@ -1,39 +1,48 @@
 from __future__ import annotations
+import atexit
+import collections
+import itertools
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import re
-import sys
 import time
 import random
 import threading
 import socket
 import httpx
+import orjson
 import webbrowser
 import signal
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from typing import (
     Any,
+    Deque,
     Optional,
     TypedDict,
     Literal,
     Dict,
     List,
     Tuple,
-    IO,
     Union,
     cast,
 )
 from flask import (
     Flask,
+    g,
     request,
     jsonify,
     render_template,
     send_from_directory,
     Response,
 )
-from io import StringIO
+from flask.json.provider import JSONProvider
+from flask.logging import default_handler
 from werkzeug.wrappers.response import Response as WerkzeugResponse
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+from waitress import serve
 
 
 # ====================== 全局变量 ======================
@@ -50,8 +59,57 @@ _global = GLOBAL()
 # 最大线程数量（挂机用）
 MAX_THREADS = 32
 
+# 前端日志面板保留的最大日志条数
+LOG_BUFFER_SIZE = 2000
+
+# 请求课程列表时使用的防缓存参数，单调递增保证每次都不同
+_nocache = itertools.count(int(time.time() * 1000))
+
+# 启动时若 Cookie 在该时间（秒）内验证过，则跳过重新验证
+COOKIE_VALIDATE_TTL = 300
+
+# 用户信息缓存（按 Cookie 区分）及有效期（秒）
+USERINFO_CACHE_TTL = 300
+_userinfo_cache: Dict[int, Tuple[float, Dict[str, Optional[str]]]] = {}
+
+# 课程页面元数据解析（直接匹配响应字节，无需解码整个页面）
+UID_PATTERN = re.compile(rb'"uid":(.*?),')
+CLASSID_PATTERN = re.compile(rb'"classid":"(.*?)"')
+
+# 已登录时用户信息页面中出现的标记，用于验证 Cookie
+PROFILE_MARKER = "我的资料".encode("utf-8")
+
+# 用户信息页面各字段元素的开始标签及其结束标记，全部读到后即可停止下载
+# 匹配元素本身而不是裸 ID 片段，避免被 <head> 中引用这些 ID 的脚本提前满足
+USERINFO_FIELD_MARKERS = (
+    (re.compile(rb'<input\b[^>]*\bid="[^"]*lblAccount', re.I), b">"),
+    (re.compile(rb'<input\b[^>]*\bid="[^"]*txtName', re.I), b">"),
+    (re.compile(rb'<input\b[^>]*\bid="[^"]*txtStuNo', re.I), b">"),
+    (re.compile(rb'<select\b[^>]*\bid="[^"]*txtSchool', re.I), b"</select>"),
+    (re.compile(rb'<select\b[^>]*\bid="[^"]*ddlYear', re.I), b"</select>"),
+)
+
+# 用户信息字段的 CSS 选择器（[id*=...] 按 ID 片段匹配）
+ACCOUNT_SELECTOR = 'input[id*="lblAccount"]'
+NAME_SELECTOR = 'input[id*="txtName"]'
+STUDENT_ID_SELECTOR = 'input[id*="txtStuNo"]'
+SCHOOL_SELECTOR = 'select[id*="txtSchool"] option[selected]'
+SCHOOL_BUTTON_SELECTOR = "button.multiselect"
+BIRTHYEAR_SELECTOR = 'select[id*="ddlYear"] option[selected]'
+
 # ====================== 应用初始化 ======================
+class OrjsonProvider(JSONProvider):
+    """基于 orjson 的 JSON 序列化，jsonify 等接口自动使用"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 
 # ====================== 日志系统配置 ======================
@@ -74,34 +132,78 @@ class AppLogFilter(logging.Filter):
         return log_type.startswith("APP")
 
 
+class BufferedFileHandler(logging.FileHandler):
+    """带写缓冲的文件日志处理器，由 BatchQueueListener 批量落盘"""
+
+    def __init__(
+        self,
+        filename: str,
+        mode: str = "a",
+        encoding: Optional[str] = None,
+        buffer_size: int = 64 * 1024,
+    ):
+        self.buffer_size = buffer_size
+        super().__init__(filename, mode=mode, encoding=encoding)
+
+    def _open(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.buffer_size,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def flush(self):
+        """逐条记录时不落盘，统一由 flush_buffer 写入"""
+
+    def flush_buffer(self):
+        super().flush()
+
+    def close(self):
+        self.flush_buffer()
+        super().close()
+
+
+class BatchQueueListener(logging.handlers.QueueListener):
+    """日志队列监听器，队列清空时才把缓冲区写入磁盘"""
+
+    def handle(self, record):
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                if isinstance(handler, BufferedFileHandler):
+                    handler.flush_buffer()
+
+
 # 创建日志目录
 log_dir = "logs"
 if not os.path.exists(log_dir):
     os.makedirs(log_dir)
 
 # 原日志处理器（保留最新日志）
-file_handler = logging.FileHandler(
+file_handler = BufferedFileHandler(
     os.path.join(log_dir, "latest.log"), mode="a", encoding="utf-8"
 )
 file_handler.setLevel(logging.INFO)
 file_handler.setFormatter(logging.Formatter("%(message)s"))
 
 # 新增分类日志处理器
-system_handler = logging.FileHandler(
+system_handler = BufferedFileHandler(
     os.path.join(log_dir, "system.log"), mode="a", encoding="utf-8"
 )
 system_handler.setLevel(logging.INFO)
 system_handler.setFormatter(logging.Formatter("%(message)s"))
 system_handler.addFilter(LogTypeFilter("SYSTEM"))
 
-app_handler = logging.FileHandler(
+app_handler = BufferedFileHandler(
     os.path.join(log_dir, "app.log"), mode="a", encoding="utf-8"
 )
 app_handler.setLevel(logging.INFO)
 app_handler.setFormatter(logging.Formatter("%(message)s"))
 app_handler.addFilter(AppLogFilter())
 
-access_handler = logging.FileHandler(
+access_handler = BufferedFileHandler(
     os.path.join(log_dir, "access.log"), mode="a", encoding="utf-8"
 )
 access_handler.setLevel(logging.INFO)
@@ -113,13 +215,22 @@ console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(logging.Formatter("%(message)s"))
 
-# 配置应用日志
+# 配置应用日志：请求线程只负责入队，由后台监听线程统一写文件和控制台
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_listener = BatchQueueListener(
+    log_queue,
+    file_handler,
+    console_handler,
+    system_handler,
+    app_handler,
+    access_handler,
+    respect_handler_level=True,
+)
 app.logger.setLevel(logging.INFO)
-app.logger.addHandler(file_handler)
-app.logger.addHandler(console_handler)
-app.logger.addHandler(system_handler)
-app.logger.addHandler(app_handler)
-app.logger.addHandler(access_handler)
+app.logger.removeHandler(default_handler)
+app.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+log_listener.start()
+atexit.register(log_listener.stop)
 
 
 # ====================== 类型定义 ======================
@@ -156,43 +267,47 @@ class GlobalState:
     """全局状态管理器"""
 
     def __init__(self):
+        self.progress_lock = threading.Lock()
         self.reset()
 
     def reset(self):
         """重置所有状态"""
-        self.current_task: Optional[threading.Thread] = None
+        # 通知仍在运行的任务退出，避免其持有的旧事件再也无人设置
+        if hasattr(self, "stop_event"):
+            self.stop_event.set()
+        self.current_task: Optional[Future] = None
         self.task_status: TaskStatusType = "nologon"
-        self.progress: ProgressInfo = {"current": 0, "total": 0}
-        self.log_buffer: IO[str] = StringIO()
+        # (current, total)，整体替换元组而不是原地修改，/api/status 读取时再组装字典
+        self.progress: Tuple[int, int] = (0, 0)
+        self.log_buffer: Deque[str] = collections.deque(maxlen=LOG_BUFFER_SIZE)
         self.stop_event = threading.Event()
-        self.active_threads: List[threading.Thread] = []
+        _userinfo_cache.clear()
+        self.active_threads: List[Future] = []
         self.cookies: Optional[Dict[str, str]] = None
         self.cid: Optional[str] = None
         self.uid: Optional[str] = None
         self.classid: Optional[str] = None
 
+    def advance_progress(self, current: int = 1, total: int = 0):
+        """增加进度计数，多个小节线程并发更新时加锁"""
+        with self.progress_lock:
+            old_current, old_total = self.progress
+            self.progress = (old_current + current, old_total + total)
 
-state = GlobalState()
-client = httpx.Client()
-
-
-# ====================== 日志工具 ======================
-class LogCapture:
-    """日志捕获上下文管理器"""
-
-    def __init__(self, buffer: StringIO):
-        self.buffer = buffer
-        self.original_stdout = sys.stdout
-        self.original_stderr = sys.stderr
-
-    def __enter__(self):
-        sys.stdout = self.buffer
-        sys.stderr = self.buffer
-        return self
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        sys.stdout = self.original_stdout
-        sys.stderr = self.original_stderr
+state = GlobalState()
+# 所有请求共用一个客户端，复用到 welearn.sflep.com 的连接（HTTP/2 多路复用）
+# 路由和刷课/挂机任务线程共用这个同步客户端，因此不迁移到 ASGI + httpx.AsyncClient
+client = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(
+        max_keepalive_connections=20, max_connections=40, keepalive_expiry=30.0
+    ),
+    timeout=httpx.Timeout(10.0, connect=5.0),
+    headers={"Referer": "https://welearn.sflep.com/student/index.aspx"},
+)
+# 刷课/挂机任务线程池，复用工作线程
+executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="task")
 
 
 # ====================== 日志工具 ======================
@@ -200,7 +315,7 @@ def log_message(message: str, log_type: str = "SYSTEM"):
     """统一日志记录函数"""
     timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     log_entry = f"[{timestamp}] [{log_type}] {message}"
-    state.log_buffer.write(log_entry + "\n")
+    state.log_buffer.append(log_entry)
     app.logger.info(log_entry, extra={"log_type": log_type})
 
 
@@ -208,21 +323,22 @@ def log_message(message: str, log_type: str = "SYSTEM"):
 @app.before_request
 def record_request_start():
     """记录请求开始时间"""
-    request.start_time = time.time()
+    g.start_time = time.perf_counter()
 
 
 @app.after_request
 def log_access(response: Response):
     """记录访问日志"""
-    latency = time.time() - request.start_time
+    latency = time.perf_counter() - g.start_time
     latency_ms = int(latency * 1000)
+    user_agent = request.environ.get("HTTP_USER_AGENT", "")
 
     log_entry = (
         f"{request.remote_addr} "
         f'"{request.method} {request.path}" '
         f"{response.status_code} "
         f"{latency_ms}ms "
-        f"\"{request.headers.get('User-Agent', '')}\""
+        f'"{user_agent}"'
     )
 
     log_message(log_entry, "ACCESS")
@@ -241,6 +357,26 @@ def get_port():
     raise ValueError("No available ports between 3000-60000")
 
 
+def _parse_cookie_string(cookies: str) -> Dict[str, str]:
+    """按 "key=value" 拆分 Cookie 字符串，去除键和值的前后空格，跳过空键"""
+    return {
+        key.strip(): value.strip()
+        for key, _, value in (part.partition("=") for part in cookies.split(";"))
+        if key.strip()
+    }
+
+
+def _loads_upstream(content: bytes) -> Any:
+    """解析上游接口返回的 JSON，去掉 .aspx 接口可能带有的 UTF-8 BOM（orjson 不接受）"""
+    return orjson.loads(content.removeprefix(b"\xef\xbb\xbf"))
+
+
+def save_config(cookies: str):
+    """保存原始 Cookie 字符串及其验证时间"""
+    with open("config.json", "w") as f:
+        json.dump({"cookies": cookies, "validated_at": time.time()}, f)
+
+
 def get_user_info(client: httpx.Client) -> Dict[str, Optional[str]]:
     """
     从用户信息页面提取用户详细信息
@@ -257,22 +393,23 @@ def get_user_info(client: httpx.Client) -> Dict[str, Optional[str]]:
     info_url = "https://welearn.sflep.com/user/userinfo.aspx"
 
     try:
-        # 发送GET请求获取用户信息页面
-        response = client.get(info_url)
-        response.raise_for_status()
+        # 流式获取用户信息页面，只读取到所需字段为止
+        with client.stream("GET", info_url) as response:
+            response.raise_for_status()
+            html = _read_userinfo_fragment(response)
 
-        # 使用BeautifulSoup解析HTML
-        soup = BeautifulSoup(response.text, "html.parser")
-        user_div = soup.find("div", id="user1")
+        # 使用Lexbor解析HTML
+        tree = LexborHTMLParser(html)
+        user_div = tree.css_first("div#user1")
 
-        if not user_div:
+        if user_div is None:
             raise ValueError("未找到用户信息面板")
 
         # 使用CSS选择器精确查找各字段
         return {
-            "username": _find_input_value(user_div, "lblAccount"),
-            "name": _find_input_value(user_div, "txtName"),
-            "student_id": _find_input_value(user_div, "txtStuNo"),
+            "username": _find_input_value(user_div, ACCOUNT_SELECTOR),
+            "name": _find_input_value(user_div, NAME_SELECTOR),
+            "student_id": _find_input_value(user_div, STUDENT_ID_SELECTOR),
             "school": _find_selected_school(user_div),
             "birth_year": _find_selected_birthyear(user_div),
         }
@@ -288,35 +425,73 @@ def get_user_info(client: httpx.Client) -> Dict[str, Optional[str]]:
     }
 
 
-def _find_input_value(soup: BeautifulSoup, id_fragment: str) -> Optional[str]:
-    """查找包含指定ID片段的输入框值"""
-    input_tag = soup.find("input", id=lambda x: x and id_fragment in x)
-    return input_tag.get("value") if input_tag else None
+def _read_userinfo_fragment(response: httpx.Response) -> str:
+    """读取响应直到所有用户信息字段都已完整出现"""
+    buffer = bytearray()
+    # 各字段开始标签的结束位置（未找到为 None）及是否已读到结束标记
+    tag_ends: List[Optional[int]] = [None] * len(USERINFO_FIELD_MARKERS)
+    complete = [False] * len(USERINFO_FIELD_MARKERS)
+    for chunk in response.iter_bytes(chunk_size=8192):
+        scanned = len(buffer)
+        buffer += chunk
+        # 只扫描新到的数据；上一块末尾可能有未读完的标签，从其 "<" 处继续匹配
+        tag_resume = max(buffer.rfind(b"<", 0, scanned), 0)
+        for i, (pattern, end) in enumerate(USERINFO_FIELD_MARKERS):
+            if complete[i]:
+                continue
+            if tag_ends[i] is None:
+                match = pattern.search(buffer, tag_resume)
+                if match is None:
+                    continue
+                tag_ends[i] = end_resume = match.end()
+            else:
+                end_resume = max(tag_ends[i], scanned - len(end) + 1)
+            complete[i] = buffer.find(end, end_resume) != -1
+        if all(complete):
+            break
+    return buffer.decode(response.encoding or "utf-8", errors="replace")
+
+
+def get_cached_user_info() -> Dict[str, Optional[str]]:
+    """获取当前登录用户信息，缓存未过期时不再请求页面"""
+    if not state.cookies:
+        return get_user_info(client)
+
+    key = hash(frozenset(state.cookies.items()))
+    cached = _userinfo_cache.get(key)
+    if cached and time.monotonic() - cached[0] < USERINFO_CACHE_TTL:
+        return cached[1]
 
+    userinfo = get_user_info(client)
+    # 获取失败时返回的是全空字典，不写入缓存
+    if any(value is not None for value in userinfo.values()):
+        _userinfo_cache[key] = (time.monotonic(), userinfo)
+    return userinfo
 
-def _find_selected_school(soup: BeautifulSoup) -> Optional[str]:
+
+def _find_input_value(node: LexborNode, selector: str) -> Optional[str]:
+    """查找匹配选择器的输入框值"""
+    input_tag = node.css_first(selector)
+    return input_tag.attributes.get("value") if input_tag is not None else None
+
+
+def _find_selected_school(node: LexborNode) -> Optional[str]:
     """解析学校选择信息"""
-    select_tag = soup.find("select", id=lambda x: x and "txtSchool" in x)
-    if select_tag:
-        selected = select_tag.find("option", selected=True)
-        if selected:
-            return selected.get("value")
+    selected = node.css_first(SCHOOL_SELECTOR)
+    if selected is not None:
+        return selected.attributes.get("value")
 
-    button = soup.find("button", class_="multiselect")
-    if button and button.get("title"):
-        return button["title"]
+    button = node.css_first(SCHOOL_BUTTON_SELECTOR)
+    if button is not None and button.attributes.get("title"):
+        return button.attributes["title"]
 
     return None
 
 
-def _find_selected_birthyear(soup: BeautifulSoup) -> Optional[str]:
+def _find_selected_birthyear(node: LexborNode) -> Optional[str]:
     """解析出生年份选择"""
-    select_tag = soup.find("select", id=lambda x: x and "ddlYear" in x)
-    if not select_tag:
-        return None
-
-    selected = select_tag.find("option", selected=True)
-    return selected.get("value") if selected else None
+    selected = node.css_first(BIRTHYEAR_SELECTOR)
+    return selected.attributes.get("value") if selected is not None else None
 
 
 # ====================== 路由定义 ======================
@@ -340,30 +515,13 @@ def api_login(cookies: str = None):
         if not cookies:
             cookies = request.json.get("cookies", "")
 
-        cookie_dict = {}
-        for part in cookies.split(";"):
-            cleaned_part = part.strip()  # 移除整个 "key=value" 部分的前后空格
-            if not cleaned_part:
-                continue  # 跳过空字符串
-
-            eq_index = cleaned_part.find("=")
-            if eq_index != -1:
-                key = cleaned_part[:eq_index].strip()  # 移除键名部分的前后空格
-                value = cleaned_part[eq_index + 1 :].strip()  # 移除值部分的前后空格
-                if key:  # 确保键名不为空
-                    cookie_dict[key] = value
-            else:
-                key = cleaned_part.strip()
-                if key:
-                    cookie_dict[key] = ""
-
+        cookie_dict = _parse_cookie_string(cookies)
         log_message(f"尝试登录: {cookie_dict}")
         if validate_cookies(cookie_dict):
             client.cookies.update(cookie_dict)
             state.cookies = cookie_dict
-            with open("config.json", "w") as f:
-                json.dump({"cookies": cookies}, f)  # 这里保存的是原始cookies字符串
-            userinfo = get_user_info(client)
+            save_config(cookies)  # 这里保存的是原始cookies字符串
+            userinfo = get_cached_user_info()
             log_message(f"登录成功: {userinfo}")
             state.task_status = "idle"
             return jsonify(
@@ -385,12 +543,10 @@ def get_courses():
         return jsonify(success=False, error="请先登录")
 
     try:
-        url = f"https://welearn.sflep.com/ajax/authCourse.aspx?action=gmc&nocache={round(random.random(), 16)}"
-        response = client.get(
-            url, headers={"Referer": "https://welearn.sflep.com/student/index.aspx"}
-        )
+        url = f"https://welearn.sflep.com/ajax/authCourse.aspx?action=gmc&nocache={next(_nocache)}"
+        response = client.get(url)
         log_message(f"获取课程列表: {response.text}", "APPDEBUG")
-        courses: List[CourseInfo] = response.json()["clist"]
+        courses: List[CourseInfo] = _loads_upstream(response.content)["clist"]
         return jsonify(success=True, error="", courses=courses)
     except Exception as e:
         return jsonify(success=False, error=str(e))
@@ -410,9 +566,12 @@ def get_lessons():
             url,
             headers={"Referer": "https://welearn.sflep.com/student/course_info.aspx"},
         )
-        log_message(f"成功获取到返回：{response.text}", "APPDEBUG")
-        _global.uid = re.search('"uid":(.*?),', response.text).group(1)
-        _global.classid = re.search('"classid":"(.*?)"', response.text).group(1)
+        log_message(
+            f"成功获取到返回：HTTP {response.status_code}，{len(response.content)} 字节",
+            "APPDEBUG",
+        )
+        _global.uid = UID_PATTERN.search(response.content).group(1).decode()
+        _global.classid = CLASSID_PATTERN.search(response.content).group(1).decode()
         log_message(
             f"成功解析到单元元数据: uid={_global.uid}, classid={_global.classid}",
             "APPDEBUG",
@@ -424,7 +583,7 @@ def get_lessons():
             headers={"Referer": "https://welearn.sflep.com/student/course_info.aspx"},
         )
         log_message(f"获取课程单元列表: {response.text}", "APPDEBUG")
-        lessons = response.json()["info"]
+        lessons = _loads_upstream(response.content)["info"]
         _global.lessonList = lessons
         _global.lessonIndex = [i.get("id") for i in lessons]
         return jsonify(success=True, error="", lessons=lessons)
@@ -460,7 +619,7 @@ def get_sections():
             },
         )
         log_message(f"获取小节列表: {response.text}", "APPDEBUG")
-        sections = response.json().get("info", [])
+        sections = _loads_upstream(response.content).get("info", [])
         return jsonify(success=True, error="", sections=sections)
     except Exception as e:
         return jsonify(success=False, error=str(e))
@@ -472,7 +631,7 @@ def start_task():
     try:
         if not state.task_status in ["idle", "completed", "error"]:
             return jsonify(success=False, error="已有任务在进行中")
-        state.progress = {"current": 0, "total": 0}
+        state.progress = (0, 0)
         data = request.json
         log_message(data)
         task_type = data["type"]
@@ -482,16 +641,15 @@ def start_task():
             rate = data["rate"]
             selected_sections = data.get("selectedSections")
             offset = data.get("offset")
-            thread = BrainBurstThread(lessons, rate, selected_sections, offset)
+            task = BrainBurstTask(lessons, rate, selected_sections, offset)
         elif task_type == "away_from_keyboard":
             duration = data["time"]
             selected_sections = data.get("selectedSections")
-            thread = AwayFromKeyboardThread(lessons, duration, selected_sections)
+            task = AwayFromKeyboardTask(lessons, duration, selected_sections)
         else:
             return jsonify(success=False, error="未知任务类型")
 
-        state.active_threads.append(thread)
-        thread.start()
+        state.active_threads.append(executor.submit(task.run))
         return jsonify(success=True, error="")
     except Exception as e:
         return jsonify(success=False, error=str(e))
@@ -502,8 +660,9 @@ def stop_tasks():
     """停止所有任务"""
     try:
         state.stop_event.set()
-        for t in state.active_threads:
-            t.join(timeout=5)
+        running = [f for f in state.active_threads if not f.cancel()]
+        if running:
+            wait(running, timeout=5)
         state.reset()
         return jsonify(success=True, error="")
     except Exception as e:
@@ -513,10 +672,11 @@ def stop_tasks():
 @app.route("/api/status", methods=["GET"])
 def get_status():
     """获取状态信息"""
+    current, total = state.progress
     return jsonify(
         {
             "status": state.task_status,
-            "progress": state.progress,
+            "progress": ProgressInfo(current=current, total=total),
             "activeThreads": len(state.active_threads),
             "success": True,
         }
@@ -527,7 +687,7 @@ def get_status():
 def get_log():
     """返回当前日志缓冲内容"""
     try:
-        logs = state.log_buffer.getvalue()
+        logs = "\n".join(state.log_buffer)
         return jsonify(success=True, logs=logs)
     except Exception as e:
         return jsonify(success=False, error=str(e), logs="")
@@ -535,7 +695,7 @@ def get_log():
 
 @app.route("/api/getUserInfo", methods=["GET"])
 def get_user_info_route():
-    return get_user_info(client)
+    return get_cached_user_info()
 
 
 @app.route("/api/reset", methods=["GET"])
@@ -549,6 +709,7 @@ def reset():
 @app.route("/api/shutdown", methods=["GET"])
 def exit():
     """退出应用"""
+    state.stop_event.set()
     os.kill(os.getpid(), signal.SIGINT)
 
 
@@ -557,16 +718,23 @@ def validate_cookies(cookies: Dict[str, str]) -> bool:
     """验证Cookie有效性"""
     try:
         test_url = "https://welearn.sflep.com/user/userinfo.aspx"
-        resp = client.get(test_url, cookies=cookies)
-        log_message(f"Cookie验证返回：{resp.text}", "APPDEBUG")
-        return "我的资料" in resp.text
+        with client.stream("GET", test_url, cookies=cookies) as resp:
+            log_message(f"Cookie验证返回：HTTP {resp.status_code}", "APPDEBUG")
+            # 逐块查找标记，保留上一块末尾以防标记被截断，找到后立即停止下载
+            tail = b""
+            for chunk in resp.iter_bytes(chunk_size=4096):
+                window = tail + chunk
+                if PROFILE_MARKER in window:
+                    return True
+                tail = window[-(len(PROFILE_MARKER) - 1) :]
+            return False
     except Exception as e:
         log_message(f"Cookie验证失败: {str(e)}")
         return False
 
 
-class BrainBurstThread(threading.Thread):
-    """智能刷课线程"""
+class BrainBurstTask:
+    """智能刷课任务"""
 
     def __init__(
         self,
@@ -575,12 +743,24 @@ class BrainBurstThread(threading.Thread):
         selectedSections: Optional[Dict[str, List[str]]] = None,
         offset: Optional[str] = None,
     ):
-        super().__init__()
-        self.daemon = True
         self.lessonIds = lessonIds
         self.rate = int(rate) if "-" not in rate else tuple(map(int, rate.split("-")))
         self.selectedSections = selectedSections or {}
         self.offset = offset
+        self.stop_event = state.stop_event
+
+    def _wait_offset(self):
+        """小节之间错开等待，停止任务时立即返回"""
+        if not self.offset:
+            return
+        try:
+            if "-" in self.offset:
+                a, b = map(int, self.offset.split("-"))
+                self.stop_event.wait(random.uniform(a, b))
+            else:
+                self.stop_event.wait(int(self.offset))
+        except Exception:
+            pass
 
     def run(self):
         try:
@@ -589,8 +769,10 @@ class BrainBurstThread(threading.Thread):
                 "Referer": f"https://welearn.sflep.com/student/course_info.aspx?cid={_global.cid}",
             }
             # 重新计算总数
-            state.progress = {"current": 0, "total": 0}
+            state.progress = (0, 0)
             for lesson in self.lessonIds:  # 获取课程详细列表
+                if self.stop_event.is_set():
+                    return
                 response = client.get(
                     f"https://welearn.sflep.com/ajax/StudyStat.aspx?action=scoLeaves&cid={_global.cid}&uid={_global.uid}&unitidx={_global.lessonIndex.index(lesson)}&classid={_global.classid}",
                     headers=infoHeaders,
@@ -602,17 +784,18 @@ class BrainBurstThread(threading.Thread):
                         f"获取课程 {lesson} 详细列表失败: {response.text}", "APPERR"
                     )
                     return
-                sections = response.json()["info"]
+                detail = _loads_upstream(response.content)
+                log_message(f"获取到课程 {lesson} 的详细信息 {detail}", "APPDEBUG")
+                sections = detail["info"]
                 # 仅处理选择的小节（如果有）
                 if lesson in self.selectedSections and self.selectedSections[lesson]:
                     wanted = set(self.selectedSections[lesson])
                     sections = [s for s in sections if s.get("id") in wanted]
                 # 累加总数
-                state.progress["total"] += len(sections)
+                state.advance_progress(current=0, total=len(sections))
                 for section in sections:  # 获取课程的小节列表并刷课
-                    log_message(
-                        f"获取到课程 {lesson} 的详细信息 {response.json()}", "APPDEBUG"
-                    )
+                    if self.stop_event.is_set():
+                        return
                     if section["isvisible"] == "false":
                         log_message(f'跳过未开放课程 {section["location"]}', "APPERR")
                         log_message(f"课程 {lesson} 的返回信息：{section}", "APPDEBUG")
@@ -661,17 +844,9 @@ class BrainBurstThread(threading.Thread):
                                 "APPINFO",
                             )
                             # 第 N 类刷课法 neta 了高数的第 N 类积分法
-                            state.progress["current"] += 1
+                            state.advance_progress()
                             # 小节错开（仅刷课模式）
-                            if self.offset:
-                                try:
-                                    if "-" in self.offset:
-                                        a, b = map(int, self.offset.split("-"))
-                                        time.sleep(random.uniform(a, b))
-                                    else:
-                                        time.sleep(int(self.offset))
-                                except Exception:
-                                    pass
+                            self._wait_offset()
                             continue
                         else:  # 第二种刷课法
                             response = client.post(
@@ -696,36 +871,27 @@ class BrainBurstThread(threading.Thread):
                                     f"刷课结果：以 {crate}% 的正确率使用“第二类刷课法”完成了课程 {section['location']}",
                                     "APPINFO",
                                 )
-                                state.progress["current"] += 1
-                                if self.offset:
-                                    try:
-                                        if "-" in self.offset:
-                                            a, b = map(int, self.offset.split("-"))
-                                            time.sleep(random.uniform(a, b))
-                                        else:
-                                            time.sleep(int(self.offset))
-                                    except Exception:
-                                        pass
+                                state.advance_progress()
+                                self._wait_offset()
                                 continue
                     else:
-                        state.progress["current"] += 1
+                        state.advance_progress()
                         log_message(f'跳过已完成课程 {section["location"]}', "APPINFO")
                 log_message(f"课程 {lesson} 刷课完成", "APPINFO")
             state.task_status = "completed"
         except Exception as e:
             log_message(f"刷课任务出错: {str(e)}")
-            state.progress = {"current": 0, "total": 1}
+            state.progress = (0, 1)
             state.task_status = "error"
 
 
-class AwayFromKeyboardThread(threading.Thread):
-    """挂机刷时长线程"""
+class AwayFromKeyboardTask:
+    """挂机刷时长任务"""
 
     def __init__(self, lessonIds: List[str], duration: str, selectedSections: Optional[Dict[str, List[str]]] = None):
-        super().__init__()
         self.lessonIds = lessonIds
         self.duration = duration
-        self.daemon = True
+        self.stop_event = state.stop_event
         self.wrong_lessons = []
         self.max_threads = 64
         self.retry_delay = 3
@@ -745,13 +911,16 @@ class AwayFromKeyboardThread(threading.Thread):
                         f"请求 {url} 失败 ({str(e)})，{self.retry_delay} 秒后重试...",
                         "APPERR",
                     )
-                    time.sleep(self.retry_delay)
+                    if self.stop_event.wait(self.retry_delay):
+                        raise
                 else:
                     log_message(f"请求 {url} 失败，已达最大重试次数", "APPERR")
                     raise
 
     def _process_section(self, section):
         """处理单个课程小节"""
+        if self.stop_event.is_set():
+            return
         try:
             log_message(f'开始处理: {section["location"]}', "APPINFO")
             scoid = section["id"]
@@ -787,9 +956,9 @@ class AwayFromKeyboardThread(threading.Thread):
                     },
                 )
 
-            back = json.loads(response.text)["comment"]
+            back = _loads_upstream(response.content)["comment"]
             if "cmi" in back:
-                cmi = json.loads(back)["cmi"]
+                cmi = orjson.loads(back)["cmi"]
                 session_time = cmi.get("session_time", "0")
                 total_time = cmi.get("total_time", "0")
             else:
@@ -819,7 +988,8 @@ class AwayFromKeyboardThread(threading.Thread):
             )
 
             for current_time in range(1, learn_time + 1):
-                time.sleep(1)
+                if self.stop_event.wait(1):
+                    return
                 if current_time % 60 == 0:
                     self._http_request_with_retry(
                         "POST",
@@ -856,7 +1026,7 @@ class AwayFromKeyboardThread(threading.Thread):
                 },
             )
 
-            state.progress["current"] += 1
+            state.advance_progress()
             log_message(
                 f'完成学习: {section["location"]} 耗时: {learn_time}秒', "APPINFO"
             )
@@ -865,60 +1035,57 @@ class AwayFromKeyboardThread(threading.Thread):
             self.wrong_lessons.append(section["location"])
             log_message(f'处理失败: {section["location"]} - {str(e)}', "APPERR")
 
+    def _load_unit_sections(self, lesson_id: str) -> List[Dict[str, Any]]:
+        """获取单元下需要挂机的小节列表"""
+        unit_index = _global.lessonIndex.index(lesson_id)
+        sections = []
+        while not self.stop_event.is_set():
+            try:
+                response = self._http_request_with_retry(
+                    "GET",
+                    f"https://welearn.sflep.com/ajax/StudyStat.aspx?action=scoLeaves&cid={_global.cid}&uid={_global.uid}&unitidx={unit_index}&classid={_global.classid}",
+                    headers={
+                        "Referer": f"https://welearn.sflep.com/student/course_info.aspx?cid={_global.cid}"
+                    },
+                )
+                sections = _loads_upstream(response.content).get("info", [])
+                break
+            except Exception:
+                self.stop_event.wait(self.retry_delay)
+        # 过滤未开放小节
+        visible_sections = [s for s in sections if s.get("isvisible") != "false"]
+        # 如指定了选择的小节，则仅保留这些
+        if lesson_id in self.selectedSections and self.selectedSections[lesson_id]:
+            wanted = set(self.selectedSections[lesson_id])
+            visible_sections = [s for s in visible_sections if s.get("id") in wanted]
+        return visible_sections
+
     def run(self):
-        """线程主函数"""
+        """任务主函数"""
         try:
             state.task_status = "away_from_keyboard"
 
             # 预加载所有选择单元的小节以计算总任务数，并保持与文档描述一致
-            units_sections: List[List[Dict[str, Any]]] = []
-            total_sections = 0
-
-            for lesson_id in self.lessonIds:
-                unit_index = _global.lessonIndex.index(lesson_id)
-                sections = []
-                while not state.stop_event.is_set():
-                    try:
-                        response = self._http_request_with_retry(
-                            "GET",
-                            f"https://welearn.sflep.com/ajax/StudyStat.aspx?action=scoLeaves&cid={_global.cid}&uid={_global.uid}&unitidx={unit_index}&classid={_global.classid}",
-                            headers={
-                                "Referer": f"https://welearn.sflep.com/student/course_info.aspx?cid={_global.cid}"
-                            },
-                        )
-                        sections = response.json().get("info", [])
-                        break
-                    except Exception:
-                        time.sleep(self.retry_delay)
-                if state.stop_event.is_set():
-                    return
-                # 过滤未开放小节
-                visible_sections = [s for s in sections if s.get("isvisible") != "false"]
-                # 如指定了选择的小节，则仅保留这些
-                if lesson_id in self.selectedSections and self.selectedSections[lesson_id]:
-                    wanted = set(self.selectedSections[lesson_id])
-                    visible_sections = [s for s in visible_sections if s.get("id") in wanted]
-                units_sections.append(visible_sections)
-                total_sections += len(visible_sections)
+            # 各单元的请求互不依赖，并发发出，共用同一个客户端的连接
+            with ThreadPoolExecutor(
+                max_workers=min(len(self.lessonIds), self.max_threads) or 1,
+                thread_name_prefix="unit",
+            ) as pool:
+                units_sections = list(pool.map(self._load_unit_sections, self.lessonIds))
+            if self.stop_event.is_set():
+                return
 
-            state.progress["total"] = total_sections
+            state.progress = (0, sum(map(len, units_sections)))
 
             # 并发处理每个单元的小节
             for sections in units_sections:
-                thread_pool = []
-                for section in sections:
-                    if state.stop_event.is_set():
-                        break
-                    while len(thread_pool) >= self.max_threads:
-                        thread_pool = [t for t in thread_pool if t.is_alive()]
-                        time.sleep(1)
-                        if state.stop_event.is_set():
-                            break
-                    t = threading.Thread(target=self._process_section, args=(section,))
-                    t.start()
-                    thread_pool.append(t)
-                for t in thread_pool:
-                    t.join()
+                if self.stop_event.is_set():
+                    return
+                with ThreadPoolExecutor(
+                    max_workers=self.max_threads, thread_name_prefix="section"
+                ) as pool:
+                    for section in sections:
+                        pool.submit(self._process_section, section)
 
             state.task_status = "completed"
             log_message(
@@ -935,18 +1102,21 @@ if __name__ == "__main__":
     try:
         with open("config.json") as f:
             config = json.load(f)
-            if cookies_str := config.get("cookies"):
-                cookie_dict = dict(
-                    map(lambda x: x.split("=", 1), cookies_str.split(";"))
-                )
-                log_message("配置加载成功，正在尝试自动登录……")
-                if validate_cookies(cookie_dict):
-                    state.cookies = cookie_dict
-                    client.cookies.update(cookie_dict)
-                    log_message("自动登录成功")
-                    state.task_status = "idle"
-                else:
-                    log_message("自动登录失败，请更新 Cookie")
+        if cookies_str := config.get("cookies"):
+            cookie_dict = _parse_cookie_string(cookies_str)
+            log_message("配置加载成功，正在尝试自动登录……")
+            if time.time() - config.get("validated_at", 0) < COOKIE_VALIDATE_TTL:
+                log_message("Cookie 最近已验证，跳过验证")
+                valid = True
+            elif valid := validate_cookies(cookie_dict):
+                save_config(cookies_str)
+            if valid:
+                state.cookies = cookie_dict
+                client.cookies.update(cookie_dict)
+                log_message("自动登录成功")
+                state.task_status = "idle"
+            else:
+                log_message("自动登录失败，请更新 Cookie")
     except FileNotFoundError:
         log_message("未找到配置文件")
     except Exception as e:
@@ -958,6 +1128,11 @@ if __name__ == "__main__":
         f"将自动打开浏览器访问 http://127.0.0.1:{port}，你也可以自己打开浏览器进行访问"
     )
     webbrowser.open(f"http://127.0.0.1:{port}")
-    # 启动应用
-    with LogCapture(state.log_buffer):
-        app.run(host="0.0.0.0", port=port, debug=False)
+    # 使用 waitress 启动应用（线程池处理请求，等待上游响应时不会阻塞其他请求）
+    # 也可以直接运行 waitress-serve --listen=0.0.0.0:5000 --threads=16 app:app，但不会自动登录
+    try:
+        serve(app, host="0.0.0.0", port=port, threads=16)
+    finally:
+        # 服务器退出后通知任务尽快结束，线程池工作线程不是守护线程
+        state.stop_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)